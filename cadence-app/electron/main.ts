@@ -64,170 +64,142 @@ ipcMain.handle('select-musicxml-file', async () => {
   };
 });
 
-// MusicXML parsing IPC handler
-ipcMain.handle('parse-musicxml', async (event, filePath: string) => {
-  return new Promise((resolve, reject) => {
-    const scriptsDir = path.join(__dirname, '..', 'scripts');
-    const scriptName = 'musicxml_parser.py';
-    
-    // Use system Python3
-    const pythonPath = process.platform === 'win32' 
-      ? 'python'
-      : 'python3';
-    
-    const options = {
-      mode: 'text' as const,
-      pythonPath: pythonPath,
-      scriptPath: scriptsDir,
-      args: ['game_notes', filePath],
-    };
+// Long-lived Python helpers. Each script runs with --serve and answers one JSON
+// request per stdin line with one JSON line, in order, so the callers waiting
+// on a process are kept in a FIFO queue. Start-up work (the music21 import,
+// the Gradio handshake) is then paid once per session instead of once per call.
+type ServiceResponse = { output?: string; error?: string };
+
+interface PythonService {
+  scriptName: string;
+  label: string;
+  shell: PythonShell | null;
+  pending: Array<(response: ServiceResponse) => void>;
+}
 
-    console.log('Parsing MusicXML file:', filePath);
-    console.log('Using script:', scriptName);
-    console.log('From directory:', scriptsDir);
+const pythonServices: PythonService[] = [];
 
-    const shell = new PythonShell(scriptName, options);
-    let output: string[] = [];
-    let errorOutput: string[] = [];
+function createPythonService(scriptName: string, label: string): PythonService {
+  const service: PythonService = { scriptName, label, shell: null, pending: [] };
+  pythonServices.push(service);
+  return service;
+}
 
-    shell.on('message', (message) => {
-      console.log('MusicXML Parser output:', message);
-      output.push(message);
-    });
+function getServiceShell(service: PythonService): PythonShell {
+  if (service.shell) {
+    return service.shell;
+  }
 
-    shell.on('stderr', (stderr) => {
-      console.error('MusicXML Parser stderr:', stderr);
-      errorOutput.push(stderr);
-    });
+  const scriptsDir = path.join(__dirname, '..', 'scripts');
 
-    shell.on('close', () => {
-      if (output.length > 0) {
-        try {
-          // Try to parse the JSON output
-          const fullOutput = output.join('\n');
-          const parsedResult = JSON.parse(fullOutput);
-          
-          if (parsedResult.error) {
-            resolve({ 
-              success: false, 
-              error: parsedResult.error 
-            });
-          } else {
-            resolve({ 
-              success: true, 
-              data: parsedResult 
-            });
-          }
-        } catch (parseError) {
-          resolve({ 
-            success: false, 
-            error: `Failed to parse Python output: ${parseError}` 
-          });
-        }
-      } else if (errorOutput.length > 0) {
-        resolve({ 
-          success: false, 
-          error: `MusicXML parsing error: ${errorOutput.join('\n')}` 
-        });
-      } else {
-        resolve({ 
-          success: false, 
-          error: 'No output from MusicXML parser' 
-        });
-      }
-    });
+  // Use system Python3
+  const pythonPath = process.platform === 'win32'
+    ? 'python'
+    : 'python3';
 
-    shell.on('error', (err) => {
-      console.error('MusicXML Parser shell error:', err);
-      resolve({ 
-        success: false, 
-        error: `Python shell error: ${err.message}` 
-      });
-    });
-  });
-});
+  const options = {
+    mode: 'text' as const,
+    pythonPath: pythonPath,
+    scriptPath: scriptsDir,
+    args: ['--serve'],
+  };
 
-// Sheet Music parsing IPC handler
-ipcMain.handle('parse-sheet-music', async (event, filePath: string) => {
-  return new Promise((resolve, reject) => {
-    const scriptsDir = path.join(__dirname, '..', 'scripts');
-    const scriptName = 'musicxml_parser.py';
-    
-    // Use system Python3
-    const pythonPath = process.platform === 'win32' 
-      ? 'python'
-      : 'python3';
-    
-    const options = {
-      mode: 'text' as const,
-      pythonPath: pythonPath,
-      scriptPath: scriptsDir,
-      args: ['sheet_music', filePath],
-    };
+  console.log(`Starting ${service.label}:`, service.scriptName);
+  console.log('From directory:', scriptsDir);
 
-    console.log('Parsing MusicXML for sheet music:', filePath);
-    console.log('Using script:', scriptName);
-    console.log('From directory:', scriptsDir);
+  const shell = new PythonShell(service.scriptName, options);
+  let errorOutput: string[] = [];
 
-    const shell = new PythonShell(scriptName, options);
-    let output: string[] = [];
-    let errorOutput: string[] = [];
+  shell.on('message', (message) => {
+    const respond = service.pending.shift();
+    if (respond) {
+      respond({ output: message });
+    }
+    errorOutput = [];
+  });
 
-    shell.on('message', (message) => {
-      console.log('Sheet Music Parser output:', message);
-      output.push(message);
-    });
+  shell.on('stderr', (stderr) => {
+    console.error(`${service.label} stderr:`, stderr);
+    errorOutput.push(stderr);
+  });
 
-    shell.on('stderr', (stderr) => {
-      console.error('Sheet Music Parser stderr:', stderr);
-      errorOutput.push(stderr);
-    });
+  const stop = (reason: string) => {
+    if (service.shell === shell) {
+      service.shell = null;
+    }
+    // Fail whatever was still waiting; the next request starts a new process
+    while (service.pending.length > 0) {
+      service.pending.shift()!({ error: reason });
+    }
+  };
 
-    shell.on('close', () => {
-      if (output.length > 0) {
-        try {
-          // Try to parse the JSON output
-          const fullOutput = output.join('\n');
-          const parsedResult = JSON.parse(fullOutput);
-          
-          if (parsedResult.error) {
-            resolve({ 
-              success: false, 
-              error: parsedResult.error 
-            });
-          } else {
-            resolve({ 
-              success: true, 
-              data: parsedResult 
-            });
-          }
-        } catch (parseError) {
-          resolve({ 
-            success: false, 
-            error: `Failed to parse Python output: ${parseError}` 
-          });
-        }
-      } else if (errorOutput.length > 0) {
-        resolve({ 
-          success: false, 
-          error: `Sheet Music parsing error: ${errorOutput.join('\n')}` 
-        });
-      } else {
-        resolve({ 
-          success: false, 
-          error: 'No output from Sheet Music parser' 
-        });
-      }
-    });
+  shell.on('close', () => {
+    stop(errorOutput.length > 0
+      ? `${service.label} error: ${errorOutput.join('\n')}`
+      : `No output from ${service.label}`);
+  });
 
-    shell.on('error', (err) => {
-      console.error('Sheet Music Parser shell error:', err);
-      resolve({ 
-        success: false, 
-        error: `Python shell error: ${err.message}` 
-      });
-    });
+  shell.on('error', (err) => {
+    console.error(`${service.label} shell error:`, err);
+    stop(`Python shell error: ${err.message}`);
   });
+
+  service.shell = shell;
+  return shell;
+}
+
+function requestService(service: PythonService, request: object): Promise<ServiceResponse> {
+  return new Promise((resolve) => {
+    service.pending.push(resolve);
+    getServiceShell(service).send(JSON.stringify(request));
+  });
+}
+
+app.on('will-quit', () => {
+  // Closing stdin ends each helper's request loop
+  for (const service of pythonServices) {
+    service.shell?.end(() => {});
+  }
+});
+
+const musicXMLParser = createPythonService('musicxml_parser.py', 'MusicXML Parser');
+
+async function requestParse(cmd: string, filePath: string): Promise<unknown> {
+  const { output, error } = await requestService(musicXMLParser, { cmd, file: filePath });
+  if (error !== undefined) {
+    return { success: false, error };
+  }
+  try {
+    const parsedResult = JSON.parse(output!);
+
+    if (parsedResult && parsedResult.error) {
+      return {
+        success: false,
+        error: parsedResult.error
+      };
+    }
+    return {
+      success: true,
+      data: parsedResult
+    };
+  } catch (parseError) {
+    return {
+      success: false,
+      error: `Failed to parse Python output: ${parseError}`
+    };
+  }
+}
+
+// MusicXML parsing IPC handler
+ipcMain.handle('parse-musicxml', async (event, filePath: string) => {
+  console.log('Parsing MusicXML file:', filePath);
+  return requestParse('game_notes', filePath);
+});
+
+// Sheet Music parsing IPC handler
+ipcMain.handle('parse-sheet-music', async (event, filePath: string) => {
+  console.log('Parsing MusicXML for sheet music:', filePath);
+  return requestParse('sheet_music', filePath);
 });
 
 // Python bridge IPC handler for running hello.py
@@ -558,116 +530,58 @@ Do NOT use any special formatting, emojis, or symbols. Just provide plain text t
 });
 
 // TTS generation using Python script with gradio_client
+const ttsGenerator = createPythonService('tts_generator.py', 'TTS Python');
+
 ipcMain.handle('generate-tts', async (event, text: string, voiceName: string = 'af_heart') => {
-  return new Promise((resolve) => {
-    const scriptsDir = path.join(__dirname, '..', 'scripts');
-    const scriptName = 'tts_generator.py';
-    
-    // Use system Python3
-    const pythonPath = process.platform === 'win32' 
-      ? 'python'
-      : 'python3';
-    
-    const options = {
-      mode: 'text' as const,
-      pythonPath: pythonPath,
-      scriptPath: scriptsDir,
-      args: [text, voiceName, 'wav', '1.0'],
+  console.log('Generating TTS with Python script:', ttsGenerator.scriptName);
+  console.log('Text:', text);
+  console.log('Voice:', voiceName);
+
+  const { output, error } = await requestService(ttsGenerator, {
+    text,
+    voice: voiceName,
+    format: 'wav',
+    speed: 1.0,
+  });
+  if (error !== undefined) {
+    return {
+      success: false,
+      error
     };
+  }
 
-    console.log('Generating TTS with Python script:', scriptName);
-    console.log('Text:', text);
-    console.log('Voice:', voiceName);
-
-    const shell = new PythonShell(scriptName, options);
-    let output: string[] = [];
-    let errorOutput: string[] = [];
-
-    shell.on('message', (message) => {
-      console.log('TTS Python output:', message);
-      output.push(message);
-    });
-
-    shell.on('stderr', (stderr) => {
-      console.error('TTS Python stderr:', stderr);
-      errorOutput.push(stderr);
-    });
-
-    shell.on('close', () => {
-      if (output.length > 0) {
-        try {
-          // Try to parse the JSON output
-          const fullOutput = output.join('\n');
-          
-          // Find JSON in the output (look for lines starting with '{')
-          const lines = fullOutput.split('\n');
-          let jsonLine = '';
-          for (const line of lines) {
-            const trimmed = line.trim();
-            if (trimmed.startsWith('{') && trimmed.endsWith('}')) {
-              jsonLine = trimmed;
-              break;
-            }
-          }
-          
-          if (!jsonLine) {
-            // Fallback: try parsing the entire output
-            jsonLine = fullOutput;
-          }
-          
-          console.log('Attempting to parse JSON:', jsonLine);
-          const result = JSON.parse(jsonLine);
-          
-                     if (result.success) {
-             // Convert file path to accessible URL
-             let audioUrl = result.audio_path;
-             if (typeof audioUrl === 'string' && audioUrl.startsWith('/')) {
-               audioUrl = `http://127.0.0.1:7860/file=${audioUrl}`;
-             }
-             
-             console.log('TTS generated successfully:', audioUrl);
-             console.log('Original file path:', result.audio_path);
-             
-             // Also provide the original file path for alternative access methods
-             resolve({ 
-               success: true, 
-               data: audioUrl,
-               filePath: result.audio_path,
-               message: result.message
-             });
-          } else {
-            resolve({ 
-              success: false, 
-              error: result.error || 'TTS generation failed'
-            });
-          }
-        } catch (parseError) {
-          resolve({ 
-            success: false, 
-            error: `Failed to parse TTS script output: ${parseError}` 
-          });
-        }
-      } else if (errorOutput.length > 0) {
-        resolve({ 
-          success: false, 
-          error: `TTS script error: ${errorOutput.join('\n')}` 
-        });
-      } else {
-        resolve({ 
-          success: false, 
-          error: 'No output from TTS script' 
-        });
+  try {
+    console.log('Attempting to parse JSON:', output);
+    const result = JSON.parse(output!);
+
+    if (result.success) {
+      // Convert file path to accessible URL
+      let audioUrl = result.audio_path;
+      if (typeof audioUrl === 'string' && audioUrl.startsWith('/')) {
+        audioUrl = `http://127.0.0.1:7860/file=${audioUrl}`;
       }
-    });
 
-    shell.on('error', (err) => {
-      console.error('TTS Python shell error:', err);
-      resolve({ 
-        success: false, 
-        error: `Python shell error: ${err.message}` 
-      });
-    });
-  });
+      console.log('TTS generated successfully:', audioUrl);
+      console.log('Original file path:', result.audio_path);
+
+      // Also provide the original file path for alternative access methods
+      return {
+        success: true,
+        data: audioUrl,
+        filePath: result.audio_path,
+        message: result.message
+      };
+    }
+    return {
+      success: false,
+      error: result.error || 'TTS generation failed'
+    };
+  } catch (parseError) {
+    return {
+      success: false,
+      error: `Failed to parse TTS script output: ${parseError}`
+    };
+  }
 });
 
 // Read audio file and convert to data URL for reliable playback
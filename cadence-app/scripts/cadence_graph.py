@@ -19,6 +19,13 @@ except ImportError:
     LANGGRAPH_AVAILABLE = False
     print("Warning: LangGraph not installed. Using basic implementation.", file=sys.stderr)
 
+# Try to import orjson for faster JSON output, fall back to the standard library
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Define the drill state structure
 class DrillState(TypedDict):
     """State structure for the drill session"""
@@ -35,13 +42,19 @@ class DrillState(TypedDict):
 # Note mappings for interval drills
 NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 
+# Lookup tables so the conversions below avoid list scans and string formatting
+_NAME_TO_BASE = {name: i for i, name in enumerate(NOTE_NAMES)}
+_MIDI_NAMES = tuple(f"{NOTE_NAMES[n % 12]}{n // 12 - 1}" for n in range(128))
+
 def note_name_to_number(note_name: str, octave: int = 4) -> int:
     """Convert note name and octave to MIDI note number"""
-    base_note = NOTE_NAMES.index(note_name)
+    base_note = _NAME_TO_BASE[note_name]
     return (octave + 1) * 12 + base_note
 
 def note_number_to_name(note_number: int) -> str:
     """Convert MIDI note number to note name with octave"""
+    if 0 <= note_number < 128:
+        return _MIDI_NAMES[note_number]
     octave = note_number // 12 - 1
     note_name = NOTE_NAMES[note_number % 12]
     return f"{note_name}{octave}"
@@ -63,17 +76,17 @@ INTERVALS = {
     "Perfect Octave": 12
 }
 
-def generate_prompt(state: DrillState) -> DrillState:
-    """Generate a new interval drill prompt"""
-    # For MVP, we'll focus on common intervals
-    common_intervals = ["Perfect Fifth", "Major Third", "Perfect Fourth", "Major Second"]
-    
+# For MVP, we'll focus on common intervals
+COMMON_INTERVALS = ("Perfect Fifth", "Major Third", "Perfect Fourth", "Major Second")
+
+def generate_prompt(state: DrillState) -> Dict[str, Any]:
+    """Generate a new interval drill prompt, returning only the changed state keys"""
     # Choose a random interval
-    interval_name = random.choice(common_intervals)
+    interval_name = random.choice(COMMON_INTERVALS)
     interval_semitones = INTERVALS[interval_name]
     
     # Choose a random root note (C4 to C6 range for playability)
-    root_note = random.randint(60, 84)  # C4 to C6
+    root_note = random.randrange(60, 85)  # C4 to C6
     target_note = root_note + interval_semitones
     
     # Ensure target note is in reasonable range
@@ -83,45 +96,50 @@ def generate_prompt(state: DrillState) -> DrillState:
     
     prompt_text = f"Play a {interval_name} starting from {note_number_to_name(root_note)}"
     
-    # Update state
-    new_state = state.copy()
-    new_state.update({
+    # LangGraph merges the returned keys into the drill state
+    return {
         "current_drill": "interval",
         "prompt": prompt_text,
         "expected_notes": [root_note, target_note],
         "user_answer": [],
         "feedback": "",
         "is_complete": False
-    })
-    
-    return new_state
+    }
+
+def note_mask(note_numbers: List[int]) -> int:
+    """Pack MIDI note numbers into the bits of one integer, ignoring repeats"""
+    mask = 0
+    for n in note_numbers:
+        mask |= 1 << n
+    return mask
 
-def evaluate_answer(state: DrillState) -> DrillState:
-    """Evaluate the user's answer against the expected notes"""
-    expected = set(state["expected_notes"])
-    user_answer = set(state["user_answer"])
+def evaluate_answer(state: DrillState) -> Dict[str, Any]:
+    """Evaluate the user's answer against the expected notes, returning only the changed state keys"""
+    # Bitmasks compare the answers as unordered sets without building set objects
+    expected = note_mask(state["expected_notes"])
+    user_answer = note_mask(state["user_answer"])
     
-    new_state = state.copy()
+    updates: Dict[str, Any] = {}
     
     # Check if the answer is correct
     if user_answer == expected:
-        new_state["feedback"] = f"✅ Correct! You played {', '.join(note_number_to_name(n) for n in state['expected_notes'])}"
-        new_state["score"] += 10
-        new_state["streak"] += 1
-    elif len(user_answer) == 0:
-        new_state["feedback"] = "❌ No notes played. Try again!"
-    elif len(user_answer) != len(expected):
-        new_state["feedback"] = f"❌ Wrong number of notes. Expected {len(expected)}, got {len(user_answer)}"
-        new_state["streak"] = 0
+        updates["feedback"] = f"✅ Correct! You played {', '.join(note_number_to_name(n) for n in state['expected_notes'])}"
+        updates["score"] = state["score"] + 10
+        updates["streak"] = state["streak"] + 1
+    elif user_answer == 0:
+        updates["feedback"] = "❌ No notes played. Try again!"
+    elif user_answer.bit_count() != expected.bit_count():
+        updates["feedback"] = f"❌ Wrong number of notes. Expected {expected.bit_count()}, got {user_answer.bit_count()}"
+        updates["streak"] = 0
     else:
         # Wrong notes
         expected_names = [note_number_to_name(n) for n in state["expected_notes"]]
         user_names = [note_number_to_name(n) for n in state["user_answer"]]
-        new_state["feedback"] = f"❌ Incorrect. Expected: {', '.join(expected_names)}, Got: {', '.join(user_names)}"
-        new_state["streak"] = 0
+        updates["feedback"] = f"❌ Incorrect. Expected: {', '.join(expected_names)}, Got: {', '.join(user_names)}"
+        updates["streak"] = 0
     
-    new_state["is_complete"] = True
-    return new_state
+    updates["is_complete"] = True
+    return updates
 
 class CadenceDrillGraph:
     """Simple drill graph implementation"""
@@ -141,7 +159,7 @@ class CadenceDrillGraph:
     
     def start_drill(self) -> Dict[str, Any]:
         """Start a new drill"""
-        self.state = generate_prompt(self.state)
+        self.state.update(generate_prompt(self.state))
         return {
             "prompt": self.state["prompt"],
             "expected_notes": self.state["expected_notes"],
@@ -152,7 +170,7 @@ class CadenceDrillGraph:
     def evaluate_answer(self, user_answer: List[int]) -> Dict[str, Any]:
         """Evaluate user's answer"""
         self.state["user_answer"] = user_answer
-        self.state = evaluate_answer(self.state)
+        self.state.update(evaluate_answer(self.state))
         
         return {
             "feedback": self.state["feedback"],
@@ -181,6 +199,18 @@ def create_langgraph_graph():
     # Compile the graph
     return workflow.compile()
 
+def write_json(data: Any) -> None:
+    """Write data to stdout as JSON, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        sys.stdout.flush()  # Keep any text already printed ahead of the JSON
+        sys.stdout.buffer.write(orjson.dumps(data))
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        # json.dump encodes chunk by chunk rather than building one large string
+        json.dump(data, sys.stdout)
+        sys.stdout.write("\n")
+
 def main():
     """Main function to handle command line execution"""
     if len(sys.argv) < 2:
@@ -197,7 +227,7 @@ def main():
     
     if command == "start_drill":
         result = drill_graph.start_drill()
-        print(json.dumps(result))
+        write_json(result)
     
     elif command == "evaluate_answer":
         if len(sys.argv) < 3:
@@ -217,7 +247,7 @@ def main():
             drill_graph.state["streak"] = current_streak
             
             result = drill_graph.evaluate_answer(user_answer)
-            print(json.dumps(result))
+            write_json(result)
             
         except json.JSONDecodeError:
             print("Error: Invalid JSON data")
@@ -4,19 +4,552 @@ MusicXML Parser for Cadence Notefall Game
 Parses MusicXML files to extract notes, timing, duration, and measures
 """
 
+from __future__ import annotations
+
 import sys
 import json
 import os
-from music21 import stream, converter, note, chord, meter, tempo, key, scale
-from music21.note import Rest
+import hashlib
+import logging
+import functools
+from bisect import bisect_left
+import math
+import pickle
+import zipfile
+from contextlib import contextmanager
+from fractions import Fraction
+import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 
+_log = logging.getLogger(__name__)
+
+# music21 takes a large share of every CLI run to import, and cached parses and
+# MIDI files read with symusic never need it, so these are bound on first use
+# by _import_music21()
+stream = converter = note = chord = meter = tempo = key = opFrac = None
+
+def _import_music21():
+    """Import the music21 modules the parser uses, once"""
+    global stream, converter, note, chord, meter, tempo, key, opFrac
+    if converter is None:
+        from music21 import stream, converter, note, chord, meter, tempo, key
+        from music21.common.numberTools import opFrac
+
+# Try to import orjson for faster JSON output, fall back to the standard library
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Try to import symusic for fast MIDI loading, fall back to music21
+try:
+    import symusic
+    SYMUSIC_AVAILABLE = True
+except ImportError:
+    SYMUSIC_AVAILABLE = False
+
+# Try to import lxml for streaming MusicXML reads, fall back to music21
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+MIDI_EXTENSIONS = ('.mid', '.midi')
+XML_EXTENSIONS = ('.xml', '.musicxml')
+MXL_EXTENSIONS = ('.mxl',)
+
+# Pitch spelling music21 uses for notes created from MIDI numbers
+MIDI_PITCH_NAMES = ('C', 'C#', 'D', 'E-', 'E', 'F', 'F#', 'G', 'G#', 'A', 'B-', 'B')
+
+# Bump whenever the parsed output changes so stale cache entries are ignored
+PARSER_VERSION = 5
+
+# Parsed note timelines are cached here, keyed by file contents and PARSER_VERSION
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+                         'cadence')
+
+# MIDI velocity reported for notes whose score does not set one
+DEFAULT_VELOCITY = 64
+
+# Articulation list of notes without any. Shared by every such note dict, so it
+# must never be mutated
+_EMPTY_LIST = []
+
+# Integer codes for the 'type' of each parsed note, used by the note columns
+NOTE_TYPE_CODES = {'note': 0, 'chord_note': 1, 'rest': 2}
+NOTE_TYPES = ('note', 'chord_note', 'rest')
+
+# The note columns filled from per-note rows, in row order, and their dtypes.
+# Rests have a midi of -1 and notes outside a measure a measure of -1.
+NOTE_ROW_COLUMNS = (
+    ('type_code', np.int8),
+    ('start_q', np.float64),
+    ('dur_q', np.float64),
+    ('measure', np.int32),
+    ('pitch', object),
+    ('octave', np.int16),
+    ('midi', np.int16),
+    ('frequency', np.float64),
+    ('velocity', np.int16),
+    ('articulation', object),  # None when the note has none
+    ('chord_root', object),
+    ('chord_quality', object),
+)
+
+# Semitones above C of each MusicXML <step>
+STEP_SEMITONES = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+
+# music21 spelling and alteration of the MusicXML <accidental> values the
+# streaming reader understands; others send the file to music21
+XML_ACCIDENTALS = {
+    'sharp': ('#', 1.0), 'natural': ('', 0.0), 'flat': ('-', -1.0),
+    'double-sharp': ('##', 2.0), 'sharp-sharp': ('##', 2.0),
+    'flat-flat': ('--', -2.0), 'double-flat': ('--', -2.0),
+    'natural-sharp': ('', 0.0), 'natural-flat': ('', 0.0),
+    'quarter-sharp': ('~', 0.5), 'quarter-flat': ('`', -0.5),
+    'three-quarters-sharp': ('#~', 1.5), 'three-quarters-flat': ('-`', -1.5),
+}
+
+# music21 spelling of each <alter> value, used when no <accidental> is given
+XML_ALTER_MODIFIERS = {
+    -2.0: '--', -1.5: '-`', -1.0: '-', -0.5: '`', 0.0: '',
+    0.5: '~', 1.0: '#', 1.5: '#~', 2.0: '##',
+}
+
+# Quarter lengths of the MusicXML note types used by <metronome> beat units
+XML_TYPE_QUARTERS = {
+    'long': 16.0, 'breve': 8.0, 'whole': 4.0, 'half': 2.0, 'quarter': 1.0,
+    'eighth': 0.5, '16th': 0.25, '32nd': 0.125, '64th': 0.0625,
+}
+
+# Tonics of the major and minor keys for -7..7 fifths, as music21 names them
+MAJOR_TONICS = ('C-', 'G-', 'D-', 'A-', 'E-', 'B-', 'F', 'C', 'G', 'D', 'A', 'E', 'B', 'F#', 'C#')
+MINOR_TONICS = ('a-', 'e-', 'b-', 'f', 'c', 'g', 'd', 'a', 'e', 'b', 'f#', 'c#', 'g#', 'd#', 'a#')
+
+_TWELFTH_ROOT_OF_TWO = 2.0 ** (1 / 12)
+
+# VexFlow notation for the durations sheet music snaps to, shortest first
+VEXFLOW_DURATIONS = (
+    (0.125, '32'),  # thirty-second note
+    (0.25, '16'),   # sixteenth note
+    (0.5, '8'),     # eighth note
+    (0.75, '8.'),   # dotted eighth
+    (1.0, 'q'),     # quarter note
+    (1.5, 'q.'),    # dotted quarter
+    (2.0, 'h'),     # half note
+    (3.0, 'h.'),    # dotted half
+    (4.0, 'w'),     # whole note
+)
+VEXFLOW_DURATION_QUARTERS = tuple(quarters for quarters, _ in VEXFLOW_DURATIONS)
+
+# Resolution of the offsets in sheet-music note ids (the usual MIDI PPQ)
+VEXFLOW_ID_TICKS_PER_QUARTER = 480
+
+# Frequency of each MIDI number, computed as music21's Pitch.frequency does
+_MIDI_FREQUENCIES = tuple(440.0 * (_TWELFTH_ROOT_OF_TWO ** float(midi - 69)) for midi in range(128))
+
+
+class UnsupportedMusicXMLError(Exception):
+    """Raised by the streaming reader for scores only music21 reads correctly"""
+
+
+class _StreamedPart:
+    """Note timeline of one MusicXML <part>, filled one <measure> at a time.
+
+    Mirrors what music21's importer does to the same measures, so the notes come
+    out with identical timing: measures are laid end to end by the latest note
+    end, chords last as long as their first note, grace notes take no time, and
+    a part with several staves is split into one timeline per staff.
+    """
+
+    def __init__(self):
+        self.divisions = None
+        self.offset = Fraction(0)  # Start of the next measure, in quarters
+        self.bar_length = Fraction(4)  # Of the last time signature seen
+        self.max_staves = 1
+        self.staff_keys = set()
+        self.last_number = 0
+        self.measure_offsets = []
+        self.measure_numbers = []
+        # One tuple per note, chord member or rest:
+        # (start_q, dur_q, type_code, name, octave, ps, velocity, not_grace, voice_rank, staff)
+        self.notes = []
+        # Tempo, time and key marks as (kind, staff, start_q, value)
+        self.marks = []
+
+    def _ticks(self, text: Optional[str]) -> int:
+        """A MusicXML duration or offset, in divisions"""
+        value = float(text)
+        if not value.is_integer():
+            raise UnsupportedMusicXMLError("fractional divisions")
+        return int(value)
+
+    def _element_ticks(self, el, tag: str) -> int:
+        child = el.find(tag)
+        if child is None or not (child.text or '').strip():
+            return 0
+        return self._ticks(child.text)
+
+    def read_measure(self, measure):
+        """Add the notes and marks of one <measure> element"""
+        number_text = measure.get('number') or ''
+        digits = ''.join(c for c in number_text if c.isdigit())
+        number = int(digits) if digits else 0
+        # Unnumbered measures ("X1", "X2", ...) keep the previous measure's number
+        suffix = ''.join(c for c in number_text if not c.isdigit())
+        if suffix == 'X' and number != self.last_number + 1:
+            number = self.last_number
+        self.last_number = number
+
+        children = list(measure)
+
+        # music21 gives each voice of a multi-voice measure its own stream, in
+        # sorted voice id order, which decides the order of simultaneous notes
+        voice_ids = set()
+        for el in children:
+            if el.tag in ('note', 'forward'):
+                voice_text = (el.findtext('voice') or '').strip()
+                if voice_text:
+                    voice_ids.add(voice_text)
+        voice_ranks = ({v: rank for rank, v in enumerate(sorted(voice_ids))}
+                       if len(voice_ids) > 1 else None)
+
+        divisions = self.divisions
+        cursor = 0
+        marks_end = 0  # Latest position of a zero-length element, in divisions
+        measure_bar = None
+        events = []  # [start, dur, type_code, name, octave, ps, velocity, not_grace, voice_rank, staff]
+        rests = []  # (event index, full measure, type, dots, tuplet) per rest
+        chord_members = []
+        note_count = rest_count = 0
+        last_voice = None
+        marks = []  # (kind, staff, position, value)
+
+        for i, el in enumerate(children):
+            tag = el.tag
+            if tag == 'note':
+                if divisions is None:
+                    raise UnsupportedMusicXMLError("note before <divisions>")
+                if el.find('unpitched') is not None:
+                    raise UnsupportedMusicXMLError("unpitched notes")
+                is_rest = el.find('rest') is not None
+                is_grace = el.find('grace') is not None
+                dur = 0 if is_grace else self._element_ticks(el, 'duration')
+                voice = (el.findtext('voice') or '').strip() or None
+                staff_text = (el.findtext('staff') or '').strip()
+                staff = int(staff_text) if staff_text else 0
+                if staff:
+                    self.staff_keys.add(staff)
+                next_el = children[i + 1] if i + 1 < len(children) else None
+                next_is_chord = (next_el is not None and next_el.tag == 'note'
+                                 and next_el.find('chord') is not None)
+
+                if el.find('chord') is not None or next_is_chord:
+                    if is_rest:
+                        raise UnsupportedMusicXMLError("rests in chords")
+                    if next_is_chord and voice is not None:
+                        last_voice = voice
+                    chord_members.append((el, dur, is_grace, voice, staff))
+                    if next_is_chord:
+                        continue
+                    # The chord is complete: it starts at the cursor and lasts as
+                    # long as its first note
+                    chord_voice = next((m[3] for m in chord_members if m[3] is not None), None)
+                    if chord_voice is not None:
+                        last_voice = chord_voice
+                    rank = self._voice_rank(voice_ranks, last_voice)
+                    first_dur, first_grace = chord_members[0][1], chord_members[0][2]
+                    chord_staff = chord_members[0][4]
+                    for member, _, _, _, _ in chord_members:
+                        name, octave, ps = self._read_pitch(member)
+                        events.append([cursor, first_dur, NOTE_TYPE_CODES['chord_note'],
+                                       name, octave, ps, self._read_velocity(member),
+                                       not first_grace, rank, chord_staff])
+                    chord_members = []
+                    cursor += first_dur
+                    continue
+
+                if voice is not None:
+                    last_voice = voice
+                rank = self._voice_rank(voice_ranks, last_voice)
+                if is_rest:
+                    rest_count += 1
+                    rest = el.find('rest')
+                    rest_type = (el.findtext('type') or '').strip()
+                    full = (rest.get('measure') == 'yes'
+                            and (not rest_type or rest_type in ('whole', 'breve')))
+                    rests.append((len(events), full, rest_type,
+                                  len(el.findall('dot')), el.find('time-modification') is not None))
+                    events.append([cursor, dur, NOTE_TYPE_CODES['rest'],
+                                   None, None, None, None, True, rank, staff])
+                else:
+                    note_count += 1
+                    name, octave, ps = self._read_pitch(el)
+                    events.append([cursor, dur, NOTE_TYPE_CODES['note'], name, octave, ps,
+                                   self._read_velocity(el), not is_grace, rank, staff])
+                cursor += dur
+
+            elif tag == 'backup':
+                cursor = max(cursor - self._element_ticks(el, 'duration'), 0)
+            elif tag == 'forward':
+                cursor += self._element_ticks(el, 'duration')
+            elif tag == 'attributes':
+                for sub in el:
+                    sub_tag = sub.tag
+                    if sub_tag == 'divisions':
+                        new_divisions = self._ticks(sub.text)
+                        if new_divisions != divisions and (events or cursor):
+                            raise UnsupportedMusicXMLError("divisions change inside a measure")
+                        divisions = new_divisions
+                    elif sub_tag == 'staves':
+                        self.max_staves = max(self.max_staves, int(sub.text))
+                    elif sub_tag in ('time', 'key', 'clef'):
+                        staff = int(sub.get('number') or 0)
+                        if staff:
+                            self.staff_keys.add(staff)
+                        marks_end = max(marks_end, cursor)
+                        if sub_tag == 'time':
+                            beats = [(b.text or '').strip() for b in sub.findall('beats')]
+                            beat_types = [(b.text or '').strip() for b in sub.findall('beat-type')]
+                            if (len(beats) != 1 or len(beat_types) != 1
+                                    or not beats[0].isdigit() or not beat_types[0].isdigit()):
+                                raise UnsupportedMusicXMLError("unusual time signature")
+                            if cursor:
+                                raise UnsupportedMusicXMLError("time signature inside a measure")
+                            numerator, denominator = int(beats[0]), int(beat_types[0])
+                            if measure_bar is None:
+                                measure_bar = Fraction(4 * numerator, denominator)
+                            marks.append(('time', staff, cursor, (numerator, denominator)))
+                        elif sub_tag == 'key':
+                            marks.append(('key', staff, cursor, self._read_key(sub)))
+            elif tag == 'direction':
+                position = cursor
+                if el.find('offset') is not None:
+                    position += self._element_ticks(el, 'offset')
+                staff_text = (el.findtext('staff') or '').strip()
+                staff = int(staff_text) if staff_text else 0
+                if staff:
+                    self.staff_keys.add(staff)
+                inserted = metronome = False
+                for direction_type in el.findall('direction-type'):
+                    for spec in direction_type:
+                        if spec.tag == 'metronome':
+                            metronome = inserted = True
+                            bpm = self._read_metronome(spec)
+                            if bpm is not False:
+                                marks.append(('tempo', staff, position, bpm))
+                        elif spec.tag in ('dynamics', 'words', 'rehearsal', 'coda', 'segno'):
+                            inserted = True
+                if not metronome:
+                    for sound in el.findall('sound'):
+                        if 'tempo' in sound.attrib:
+                            qpm = float(sound.get('tempo'))
+                            if qpm:
+                                marks.append(('tempo', staff, position, self._quarter_bpm(qpm, 1.0)))
+                                inserted = True
+                            break
+                if inserted:
+                    marks_end = max(marks_end, position)
+            elif tag == 'sound':
+                if 'tempo' in el.attrib:
+                    position = cursor
+                    if el.find('offset') is not None:
+                        position += self._element_ticks(el, 'offset')
+                    qpm = float(el.get('tempo'))
+                    if qpm:
+                        marks.append(('tempo', 0, position, self._quarter_bpm(qpm, 1.0)))
+                        marks_end = max(marks_end, position)
+            elif tag == 'harmony':
+                raise UnsupportedMusicXMLError("chord symbols")
+
+        if chord_members:
+            raise UnsupportedMusicXMLError("unterminated chord")
+        self.divisions = divisions
+
+        if measure_bar is not None:
+            self.bar_length = measure_bar
+        bar = self.bar_length
+
+        divisions = divisions or 1  # Only unset for measures without notes
+
+        # A measure's only rest, or a rest marked measure="yes", fills the bar
+        filled_rest = None
+        if rests and (rest_count == 1 and note_count == 0 or any(r[1] for r in rests)):
+            index, full, rest_type, dots, tuplet = min(
+                rests, key=lambda r: (events[r[0]][8], events[r[0]][0], r[0]))
+            rest_quarters = Fraction(events[index][1], divisions)
+            if not rest_type:
+                # Without a <type>, music21 derives the type from the duration
+                rest_type = {4: 'whole', 8: 'breve'}.get(rest_quarters, '')
+            if full or (rest_quarters != bar and rest_type in ('whole', 'breve')
+                        and dots == 0 and not tuplet):
+                filled_rest = index
+
+        highest_ticks = max((e[0] + e[1] for i, e in enumerate(events) if i != filled_rest),
+                            default=0)
+        highest = Fraction(max(highest_ticks, marks_end), divisions)
+        if filled_rest is not None:
+            highest = max(highest, Fraction(events[filled_rest][0], divisions) + bar)
+
+        # Offset of the next measure, as in music21's adjustTimeAttributesFromMeasure
+        if highest > bar:
+            overfull = highest - bar
+            if (overfull > Fraction(1, 2) or (overfull * 16).denominator == 1
+                    or (overfull * 12).denominator == 1):
+                shift = highest
+            else:
+                shift = bar
+        elif highest == 0 and not events:
+            # Empty measures get a rest for the whole bar, on every staff
+            events.append([0, 0, NOTE_TYPE_CODES['rest'], None, None, None, None, True, 0, 0])
+            filled_rest = 0
+            shift = bar
+        else:
+            shift = highest
+
+        # Exact integer arithmetic, rounded once, gives the same floats as the
+        # Fractions music21 sums offsets with
+        measure_offset = self.offset
+        num, den = measure_offset.numerator, measure_offset.denominator
+        scale = den * divisions
+        self.measure_offsets.append(num / den)
+        self.measure_numbers.append(number)
+        for i, event in enumerate(events):
+            dur_q = float(bar) if i == filled_rest else event[1] / divisions
+            self.notes.append(((num * divisions + event[0] * den) / scale, dur_q)
+                              + tuple(event[2:]))
+        for kind, staff, position, value in marks:
+            self.marks.append((kind, staff, (num * divisions + position * den) / scale, value))
+        self.offset = measure_offset + shift
+
+    @staticmethod
+    def _voice_rank(voice_ranks, voice) -> int:
+        if voice_ranks is None:
+            return 0
+        return voice_ranks.get(voice if voice is not None else '1', len(voice_ranks))
+
+    @staticmethod
+    def _read_pitch(note_el) -> Tuple[str, int, float]:
+        """music21 name, octave and pitch space value of a <note>"""
+        pitch_el = note_el.find('pitch')
+        if pitch_el is None:
+            raise UnsupportedMusicXMLError("note without a pitch")
+        step = (pitch_el.findtext('step') or '').strip()
+        octave_text = (pitch_el.findtext('octave') or '').strip()
+        if step not in STEP_SEMITONES or not octave_text:
+            raise UnsupportedMusicXMLError("incomplete pitch")
+        octave = int(octave_text)
+        alter_text = (pitch_el.findtext('alter') or '').strip()
+        alter = float(alter_text) if alter_text else None
+
+        accidental_text = (note_el.findtext('accidental') or '').strip()
+        if accidental_text:
+            if accidental_text not in XML_ACCIDENTALS:
+                raise UnsupportedMusicXMLError(f"accidental {accidental_text}")
+            # The written accidental names the note; <alter> still sets its pitch
+            modifier, accidental_alter = XML_ACCIDENTALS[accidental_text]
+            if alter is None:
+                alter = accidental_alter
+        elif alter is not None:
+            if alter not in XML_ALTER_MODIFIERS:
+                raise UnsupportedMusicXMLError(f"alter {alter}")
+            modifier = XML_ALTER_MODIFIERS[alter]
+        else:
+            modifier = ''
+
+        ps = 12.0 * (octave + 1) + STEP_SEMITONES[step] + (alter or 0.0)
+        if not 0 <= ps <= 127:
+            raise UnsupportedMusicXMLError("pitch outside the MIDI range")
+        return step + modifier, octave, ps
+
+    @staticmethod
+    def _read_velocity(note_el) -> int:
+        """MIDI velocity from a <note dynamics="..."> percentage, where 90 is 100%"""
+        dynamics = note_el.get('dynamics')
+        if dynamics is None:
+            return DEFAULT_VELOCITY
+        scalar = min(max(float(dynamics) * (90 / 12700), 0.0), 1.0)
+        return round(scalar * 127)
+
+    @staticmethod
+    def _read_metronome(metronome_el):
+        """Quarter-note BPM of a <metronome>, None without a number, or False
+        for a metric modulation, which is not a tempo"""
+        units = []
+        per_minute = None
+        for child in metronome_el:
+            if child.tag == 'beat-unit':
+                unit = (child.text or '').strip()
+                if unit not in XML_TYPE_QUARTERS:
+                    raise UnsupportedMusicXMLError(f"beat unit {unit}")
+                units.append([XML_TYPE_QUARTERS[unit], 0])
+            elif child.tag == 'beat-unit-dot':
+                if not units:
+                    raise UnsupportedMusicXMLError("beat unit dot before beat unit")
+                units[-1][1] += 1
+            elif child.tag == 'per-minute' and per_minute is None:
+                try:
+                    per_minute = float(child.text)
+                except (TypeError, ValueError):
+                    pass
+        if len(units) > 1:
+            return False
+        if per_minute is None:
+            return None
+        quarters, dots = units[0] if units else (1.0, 0)
+        return _StreamedPart._quarter_bpm(per_minute, quarters * (2 - 0.5 ** dots))
+
+    @staticmethod
+    def _quarter_bpm(per_minute: float, beat_quarters: float) -> float:
+        """Quarter-note BPM of a tempo in another beat unit, computed the way
+        music21's getQuarterBPM does so the float result is identical"""
+        return float(60 / ((60 / per_minute) / beat_quarters))
+
+    @staticmethod
+    def _read_key(key_el) -> Tuple[int, Optional[str]]:
+        """Fifths and mode ('major', 'minor' or None) of a <key>"""
+        fifths_text = (key_el.findtext('fifths') or '').strip()
+        if not fifths_text or key_el.find('key-octave') is not None:
+            raise UnsupportedMusicXMLError("non-traditional key signature")
+        fifths = int(fifths_text)
+        mode = (key_el.findtext('mode') or '').strip() or None
+        if not -7 <= fifths <= 7 or mode not in (None, 'major', 'minor'):
+            raise UnsupportedMusicXMLError("unusual key signature")
+        return fifths, mode
+
+    def staves(self) -> List[Optional[int]]:
+        """The staff of each timeline this part splits into (None for the whole part)"""
+        if self.max_staves == 1:
+            return [None]
+        if not self.staff_keys:
+            raise UnsupportedMusicXMLError("staves without staff numbers")
+        return sorted(self.staff_keys)
+
+    def first_mark(self, kind: str, staff: Optional[int], predicate=None):
+        """The earliest (kind, staff, start_q, value) mark of a kind on one staff, or None"""
+        best = None
+        for mark in self.marks:
+            if mark[0] != kind or (staff is not None and mark[1] not in (0, staff)):
+                continue
+            if predicate is not None and not predicate(mark[3]):
+                continue
+            if best is None or mark[2] < best[2]:
+                best = mark
+        return best
+
+
 class MusicXMLParser:
     def __init__(self):
         self.score = None
         self.tempo_bpm = 120  # Default tempo
+        self._seconds_per_quarter = 60.0 / self.tempo_bpm
         self.time_signature = (4, 4)  # Default time signature
         self.key_signature = None
+        self._note_columns = self._note_columns_from_rows([], 0.0)
+        self._note_ends = np.empty(0, dtype=np.float64)  # End time in seconds of each note
+        self._max_duration_s = 0.0  # Longest note, bounds the get_notes_for_range search
         self.parsed_data = {
             'notes': [],
             'measures': [],
@@ -27,29 +560,382 @@ class MusicXMLParser:
             'metadata': {}
         }
     
-    def parse_file(self, file_path: str) -> Dict[str, Any]:
-        """Parse a MusicXML file and return structured data"""
+    def parse_file(self, file_path: str, notes_only: bool = False) -> Dict[str, Any]:
+        """Parse a MusicXML file and return structured data
+
+        Pass ``notes_only`` when only the note timeline is needed (the game notes).
+        The result is then served from, and written to, the on-disk parse cache,
+        MIDI files are read with symusic and MusicXML, compressed or not, is
+        streamed with lxml instead of going through music21. ``self.score`` may be left unset,
+        ``measures`` empty, and ``key_signature`` empty for MIDI files. The notes
+        stay in the note columns and ``notes`` is left empty; the query methods
+        read the columns directly.
+        """
         try:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
             
-            # Load the MusicXML file
-            self.score = converter.parse(file_path)
-            
-            # Extract metadata
-            self._extract_metadata()
-            
-            # Extract musical elements
-            self._extract_tempo_and_time_signature()
-            self._extract_key_signature()
-            self._extract_notes_and_timing()
-            self._extract_measures()
+            if notes_only:
+                cache_path = self._cache_path(file_path)
+                if self._load_cache(cache_path):
+                    return self.parsed_data
+                self._parse_notes(file_path)
+                self._save_cache(cache_path)
+                return self.parsed_data
             
+            self._parse_with_music21(file_path)
+            self.parsed_data['notes'] = self._note_dicts()
             return self.parsed_data
             
         except Exception as e:
             raise Exception(f"Error parsing MusicXML file: {str(e)}")
     
+    def _parse_notes(self, file_path: str):
+        """Parse the note timeline with the fastest reader available for the file"""
+        extension = os.path.splitext(file_path)[1].lower()
+        if SYMUSIC_AVAILABLE and extension in MIDI_EXTENSIONS:
+            self._parse_midi_notes(file_path)
+        elif LXML_AVAILABLE and extension in XML_EXTENSIONS + MXL_EXTENSIONS:
+            try:
+                if extension in MXL_EXTENSIONS:
+                    with self._open_mxl_score(file_path) as score_file:
+                        self._fast_parse_xml(score_file)
+                else:
+                    self._fast_parse_xml(file_path)
+            except (UnsupportedMusicXMLError, ValueError, TypeError) as e:
+                _log.info("Reading %s with music21: %s", file_path, e)
+                self._parse_with_music21(file_path)
+        else:
+            self._parse_with_music21(file_path)
+    
+    def _parse_with_music21(self, file_path: str):
+        """Parse the file into a music21 score and extract everything from it"""
+        _import_music21()
+        
+        # Load the MusicXML file
+        self.score = converter.parse(file_path)
+        
+        # Extract metadata
+        self._extract_metadata()
+        
+        # Extract musical elements
+        self._extract_global_metadata()
+        self._extract_notes_and_timing()
+    
+    def _cache_path(self, file_path: str) -> str:
+        """Location of the cached parse for this file's contents"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return os.path.join(CACHE_DIR, f"v{PARSER_VERSION}-{digest.hexdigest()}.pkl")
+    
+    def _load_cache(self, cache_path: str) -> bool:
+        """Restore a cached parse, returning False if there is no usable entry"""
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            _log.warning("Ignoring unreadable parse cache %s: %s", cache_path, e)
+            return False
+        
+        self.parsed_data = cached['parsed_data']
+        self._set_note_columns(cached['note_columns'])
+        self.tempo_bpm = self.parsed_data['tempo']
+        self._seconds_per_quarter = 60.0 / self.tempo_bpm
+        self.time_signature = tuple(self.parsed_data['time_signature'])
+        self.key_signature = self.parsed_data['key_signature']
+        return True
+    
+    def _save_cache(self, cache_path: str):
+        """Write the current parse to the cache; failures only cost the next parse"""
+        cached = {
+            'parsed_data': self.parsed_data,
+            'note_columns': self._note_columns,
+        }
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)  # Atomic, so readers never see a partial file
+        except OSError as e:
+            _log.warning("Could not write parse cache %s: %s", cache_path, e)
+    
+    def _parse_midi_notes(self, file_path: str):
+        """Fill the note timeline from a MIDI file using symusic.
+
+        Timing matches the music21 path: the first tempo applies to the whole file
+        and measure numbers are counted from the time signatures, starting at 1.
+        """
+        midi_score = symusic.Score(file_path, ttype='tick')
+        tpq = midi_score.ticks_per_quarter
+
+        if len(midi_score.tempos):
+            self.tempo_bpm = midi_score.tempos[0].qpm
+        if len(midi_score.time_signatures):
+            first_ts = midi_score.time_signatures[0]
+            self.time_signature = (first_ts.numerator, first_ts.denominator)
+
+        # Each time signature starts a segment of equal-length bars
+        seg_starts, seg_measures, seg_bar_ticks = [0], [1], [tpq * 4.0]
+        for ts in midi_score.time_signatures:
+            elapsed = ts.time - seg_starts[-1]
+            if elapsed > 0:
+                seg_starts.append(ts.time)
+                seg_measures.append(seg_measures[-1] + int(np.ceil(elapsed / seg_bar_ticks[-1])))
+                seg_bar_ticks.append(0.0)
+            seg_bar_ticks[-1] = tpq * 4.0 * ts.numerator / ts.denominator
+
+        tracks = [track.notes.numpy() for track in midi_score.tracks if len(track.notes)]
+
+        def column(field, dtype):
+            if not tracks:
+                return np.empty(0, dtype)
+            return np.concatenate([t[field] for t in tracks]).astype(dtype)
+
+        ticks = column('time', np.int64)
+        dur_ticks = column('duration', np.int64)
+        midis = column('pitch', np.int16)
+        velocities = column('velocity', np.int16)
+
+        order = np.argsort(ticks, kind='stable')
+        ticks, dur_ticks, midis, velocities = ticks[order], dur_ticks[order], midis[order], velocities[order]
+
+        seg = np.searchsorted(np.array(seg_starts), ticks, side='right') - 1
+        measures = (np.array(seg_measures)[seg]
+                    + (ticks - np.array(seg_starts)[seg]) // np.array(seg_bar_ticks)[seg]).astype(np.int64)
+
+        self._seconds_per_quarter = seconds_per_quarter = 60.0 / self.tempo_bpm
+        starts_q = ticks / tpq
+        durs_q = dur_ticks / tpq
+        n = len(midis)
+        pitches = np.array(MIDI_PITCH_NAMES, dtype=object)[midis % 12]
+        octaves = (midis // 12 - 1).astype(np.int16)
+        self._set_note_columns({
+            'type_code': np.full(n, NOTE_TYPE_CODES['note'], dtype=np.int8),
+            'start_q': starts_q,
+            'dur_q': durs_q,
+            'start_s': starts_q * seconds_per_quarter,
+            'dur_s': durs_q * seconds_per_quarter,
+            'measure': measures.astype(np.int32),
+            'pitch': pitches,
+            'octave': octaves,
+            'midi': midis,
+            # Python floats, so the values match pitch.frequency exactly
+            'frequency': np.array([440.0 * 2.0 ** ((midi - 69) / 12.0) for midi in midis.tolist()],
+                                  dtype=np.float64),
+            'velocity': velocities,
+            'articulation': np.full(n, None, dtype=object),
+            'chord_root': np.full(n, None, dtype=object),
+            'chord_quality': np.full(n, None, dtype=object),
+            'pitch_name': self._pitch_names(pitches, octaves),
+        })
+
+        self.parsed_data['tempo'] = self.tempo_bpm
+        self.parsed_data['time_signature'] = list(self.time_signature)
+        self.parsed_data['metadata'] = {'title': "Unknown", 'composer': "Unknown", 'copyright': ""}
+
+    @staticmethod
+    @contextmanager
+    def _open_mxl_score(file_path: str):
+        """Open the score inside a compressed MusicXML (.mxl) file for streaming.
+
+        The score is the archive member music21 would read: the first MusicXML
+        file outside META-INF. It is decompressed as it is read rather than
+        extracted first.
+        """
+        with zipfile.ZipFile(file_path) as archive:
+            names = [name for name in archive.namelist()
+                     if 'META-INF' not in name
+                     and (os.path.splitext(name)[1] in ('.musicxml', '.xml', '.mxl')
+                          or name == '.xml')]
+            if not names:
+                raise UnsupportedMusicXMLError("no MusicXML score in the archive")
+            with archive.open(names[0]) as score_file:
+                yield score_file
+
+    def _fast_parse_xml(self, source):
+        """Fill the note timeline from MusicXML without music21.
+
+        ``source`` is the path of an uncompressed MusicXML file or a binary file
+        object to read one from. It is streamed with lxml's iterparse and each
+        <measure> is dropped once read, so neither a full XML tree nor a music21
+        Stream is built. The
+        notes, tempo and measure numbers are the ones music21 would give; chord
+        roots/qualities and articulations are not filled in, and ``measures`` is
+        left empty. Raises UnsupportedMusicXMLError for notation the reader does
+        not handle, before changing any state.
+        """
+        parts = []
+        part_element = None
+        work_title = movement_title = None
+        composers = []
+        copyright_text = None
+
+        context = etree.iterparse(
+            source, events=('end',),
+            tag=('work', 'movement-title', 'identification', 'measure'),
+            remove_comments=True, remove_pis=True, remove_blank_text=True,
+            huge_tree=True, collect_ids=False,
+        )
+        root = None
+        for _, elem in context:
+            if root is None:
+                root = elem.getroottree().getroot()
+                if root.tag != 'score-partwise':
+                    raise UnsupportedMusicXMLError(f"<{root.tag}> scores")
+            tag = elem.tag
+            if tag == 'measure':
+                if elem.getparent() is not part_element:
+                    part_element = elem.getparent()
+                    parts.append(_StreamedPart())
+                parts[-1].read_measure(elem)
+                # Keep memory bounded to one measure: drop it and anything before it
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del part_element[0]
+            elif elem.getparent() is not root:
+                continue  # e.g. the <identification> of a <score-part>
+            elif tag == 'work':
+                work_title = elem.findtext('work-title') or None
+            elif tag == 'movement-title':
+                movement_title = elem.text or None
+            elif tag == 'identification':
+                composers = [(c.text or '').strip() for c in elem.findall('creator')
+                             if c.get('type') == 'composer']
+                rights = elem.find('rights')
+                if rights is not None:
+                    copyright_text = (rights.text or '').strip()
+
+        if len(composers) > 1:
+            raise UnsupportedMusicXMLError("several composers")
+        if work_title == movement_title:
+            work_title = None  # music21 treats a repeated movement title as no title
+
+        # Every staff of a multi-staff part becomes its own timeline, after the
+        # part's other staves, as music21's PartStaffs do
+        timelines = [(part, staff) for part in parts for staff in part.staves()]
+
+        def first_mark(kind, predicate=None):
+            for part, staff in timelines:
+                mark = part.first_mark(kind, staff, predicate)
+                if mark is not None:
+                    return mark
+            return None
+
+        tempo_mark = first_mark('tempo')
+        if tempo_mark is not None and tempo_mark[3] is None:
+            raise UnsupportedMusicXMLError("metronome mark without a number")
+        time_mark = first_mark('time')
+        key_mark = first_mark('key')
+        mode_mark = first_mark('key', lambda value: value[1] is not None)
+
+        starts_q, durs_q, rows, timeline_index = [], [], [], []
+        measures = []
+        for t, (part, staff) in enumerate(timelines):
+            part_starts = np.fromiter((n[0] for n in part.notes), dtype=np.float64,
+                                      count=len(part.notes))
+            # Measure numbers as music21's measureOffsetMap gives them: the first
+            # measure at each offset
+            offsets, first_index = np.unique(np.array(part.measure_offsets), return_index=True)
+            numbers = np.array(part.measure_numbers, dtype=np.int64)[first_index]
+            measure_index = np.searchsorted(offsets, part_starts, side='right') - 1
+            part_measures = np.where(measure_index >= 0, numbers[np.maximum(measure_index, 0)], -1)
+            for i, n in enumerate(part.notes):
+                if staff is None or n[9] in (0, staff):
+                    rows.append(n)
+                    starts_q.append(n[0])
+                    durs_q.append(n[1])
+                    timeline_index.append(t)
+                    measures.append(part_measures[i])
+
+        if tempo_mark is not None:
+            self.tempo_bpm = tempo_mark[3]
+        if time_mark is not None:
+            self.time_signature = time_mark[3]
+        if key_mark is not None:
+            self.key_signature = {
+                'sharps': key_mark[3][0],
+                'name': self._key_signature_name(*key_mark[3]),
+                'mode': mode_mark[3][1] if mode_mark is not None else 'major',
+            }
+        self._seconds_per_quarter = seconds_per_quarter = 60.0 / self.tempo_bpm
+
+        starts_q = np.array(starts_q, dtype=np.float64)
+        # music21 orders a part by offset, grace notes first, then by voice, and
+        # the parts by start time
+        order = np.lexsort((
+            np.arange(len(rows)),
+            np.fromiter((n[8] for n in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((n[7] for n in rows), dtype=np.int8, count=len(rows)),
+            starts_q,
+            np.array(timeline_index, dtype=np.int64),
+            starts_q * seconds_per_quarter,
+        ))
+
+        rest = NOTE_TYPE_CODES['rest']
+        note_rows = []
+        for i in order.tolist():
+            start_q, dur_q, type_code, name, octave, ps, velocity = rows[i][:7]
+            if type_code == rest:
+                note_rows.append((rest, start_q, dur_q, measures[i],
+                                  None, 0, -1, 0.0, 0, None, None, None))
+            else:
+                note_rows.append((type_code, start_q, dur_q, measures[i],
+                                  name, octave, self._midi_from_ps(ps),
+                                  self._frequency_from_ps(ps), velocity,
+                                  None, None, None))
+        self._set_note_columns(self._note_columns_from_rows(note_rows, seconds_per_quarter))
+
+        self.parsed_data['tempo'] = self.tempo_bpm
+        self.parsed_data['time_signature'] = list(self.time_signature)
+        self.parsed_data['key_signature'] = self.key_signature
+        self.parsed_data['metadata'] = {
+            'title': work_title or "Unknown",
+            'composer': (composers[0] if composers else None) or "Unknown",
+            'copyright': copyright_text or "",
+        }
+
+    @staticmethod
+    def _midi_from_ps(ps: float) -> int:
+        """MIDI number of a pitch space value, rounding half up like music21"""
+        return math.floor(ps + 0.5)
+
+    @staticmethod
+    def _frequency_from_ps(ps: float) -> float:
+        """Frequency of a pitch space value, as music21's Pitch.frequency gives it"""
+        if 0 <= ps < 128 and ps == int(ps):
+            return _MIDI_FREQUENCIES[int(ps)]
+        return 440.0 * (_TWELFTH_ROOT_OF_TWO ** (ps - 69))
+
+    @classmethod
+    def _pitch_midi_and_frequency(cls, pitch) -> Tuple[int, float]:
+        """MIDI number and frequency of a music21 Pitch.
+
+        Both are derived from one read of ``pitch.ps``; Pitch.midi and
+        Pitch.frequency each recompute it from the step, accidental and octave.
+        """
+        ps = pitch.ps
+        if 0 <= ps < 128 and ps == int(ps):
+            return int(ps), _MIDI_FREQUENCIES[int(ps)]
+        return pitch.midi, cls._frequency_from_ps(ps)
+
+    @staticmethod
+    def _key_signature_name(fifths: int, mode: Optional[str]) -> str:
+        """str() of the music21 Key or KeySignature for a MusicXML <key>"""
+        if mode == 'major':
+            return f"{MAJOR_TONICS[fifths + 7]} major"
+        if mode == 'minor':
+            return f"{MINOR_TONICS[fifths + 7]} minor"
+        if fifths == 0:
+            count = "no sharps or flats"
+        else:
+            count = f"{abs(fifths)} {'sharp' if fifths > 0 else 'flat'}{'s' if abs(fifths) > 1 else ''}"
+        return f"<music21.key.KeySignature of {count}>"
+
     def _extract_metadata(self):
         """Extract metadata from the score"""
         metadata = {}
@@ -60,84 +946,247 @@ class MusicXMLParser:
         
         self.parsed_data['metadata'] = metadata
     
-    def _extract_tempo_and_time_signature(self):
-        mm = next(self.score.recurse().getElementsByClass(tempo.MetronomeMark), None)
+    def _extract_global_metadata(self):
+        """Extract the first tempo, time signature, key signature and key.
+
+        All four come from one walk of the score, which stops as soon as each has
+        been seen. The seconds per quarter note used by the later extraction
+        steps are derived from the tempo here.
+        """
+        wanted = (tempo.MetronomeMark, meter.TimeSignature, key.KeySignature, key.Key)
+        marks = {}
+        # Parts and their measures are walked in order, so this meets each
+        # part's marks by offset
+        for el in self.score.recurse().getElementsByClass(wanted):
+            for cls in wanted:
+                # key.Key is also a KeySignature, so one element can fill two slots
+                if cls not in marks and isinstance(el, cls):
+                    marks[cls] = el
+            if len(marks) == len(wanted):
+                break
+
+        mm = marks.get(tempo.MetronomeMark)
         if mm:
             self.tempo_bpm = mm.getQuarterBPM()
-        ts = next(self.score.recurse().getElementsByClass(meter.TimeSignature), None)
+        self._seconds_per_quarter = 60.0 / self.tempo_bpm
+        ts = marks.get(meter.TimeSignature)
         if ts:
             self.time_signature = (ts.numerator, ts.denominator)
-        self.parsed_data['tempo'] = self.tempo_bpm
-        self.parsed_data['time_signature'] = list(self.time_signature)
 
-    
-    def _extract_key_signature(self):
-        """Extract key signature information"""
-        key_sigs = self.score.recurse().getElementsByClass(key.KeySignature)
-        if key_sigs:
-            key_sig = key_sigs[0]
+        key_sig = marks.get(key.KeySignature)
+        if key_sig:
             self.key_signature = {
                 'sharps': key_sig.sharps,
                 'name': str(key_sig)
             }
             
             # Try to get mode from Key objects if available
-            key_objects = self.score.recurse().getElementsByClass(key.Key)
-            if key_objects:
-                key_obj = key_objects[0]
+            key_obj = marks.get(key.Key)
+            if key_obj:
                 self.key_signature['mode'] = key_obj.mode
             else:
                 # Default to major if no Key object found
                 self.key_signature['mode'] = 'major'
-        
+
+        self.parsed_data['tempo'] = self.tempo_bpm
+        self.parsed_data['time_signature'] = list(self.time_signature)
         self.parsed_data['key_signature'] = self.key_signature
     
     def _extract_notes_and_timing(self):
-        """Populate self.parsed_data['notes'] with absolute timing for every note.
+        """Fill the note columns with absolute timing for every note.
+
+        All offsets are expressed relative to the *beginning of the score* (rather
+        than to the containing Measure or Voice), by adding up the measure, voice
+        and element offsets as ``Stream.flatten`` would. This prevents the problem
+        where many notes share an offset of ``0`` because <backup> or multiple
+        voices reset the local cursor inside a measure.
 
-        Using ``Stream.flat`` ensures that all offsets are expressed relative to the
-        *beginning of the score* (rather than to the containing Measure or Voice).
-        This prevents the problem where many notes share an offset of ``0`` because
-        <backup> or multiple voices reset the local cursor inside a measure.
+        Each note becomes one row tuple; the rows are turned into the note columns,
+        and seconds computed, for the whole score at once. Note dicts are only
+        built when asked for, by ``_note_dicts``. The walk over the first part
+        also fills ``parsed_data['measures']``.
         """
 
-        notes_data = []
+        # Each part/staff is independent and resolves its measures/voices into
+        # one timeline
+        rows = []
+        measures_data = []
+        for index, part in enumerate(self.score.parts):
+            rows.extend(self._extract_part_notes(part, measures_data if index == 0 else None))
+        self.parsed_data['measures'] = measures_data
+        columns = self._note_columns_from_rows(rows, self._seconds_per_quarter)
 
-        for part in self.score.parts:  # Iterate over each part/staff independently
-            flat_stream = part.flatten()   # "flatten" resolves measures/voices into one timeline
-
-            for el in flat_stream.notesAndRests:
-                start_q = float(el.offset)  # Already absolute within the part
-                dur_q   = float(el.duration.quarterLength)
-
-                timing = {
-                    'start_time_quarters': start_q,
-                    'duration_quarters':   dur_q,
-                    'start_time_seconds':  self._quarter_length_to_seconds(start_q),
-                    'duration_seconds':    self._quarter_length_to_seconds(dur_q),
-                    'measure_number':      (el.getContextByClass(stream.Measure).number
-                                            if el.getContextByClass(stream.Measure) else None)
-                }
-
-                if isinstance(el, note.Note):
-                    notes_data.append(self._create_note_data(el, timing))
-                elif isinstance(el, chord.Chord):
-                    for p in el.pitches:
-                        notes_data.append(self._create_chord_note_data(el, p, timing))
-                else:  # Rest
-                    notes_data.append(self._create_rest_data(el, timing))
-
-        # Sort notes by their absolute start time to guarantee chronological order
-        notes_data.sort(key=lambda n: n['start_time_seconds'])
-
-        self.parsed_data['notes'] = notes_data
-        self.parsed_data['total_duration'] = (
-            max(
-                (n['start_time_seconds'] + n['duration_seconds'] for n in notes_data),
-                default=0.0,
-            )
-        )
+        # Sort notes by their absolute start time to guarantee chronological order.
+        # A stable argsort over the start column keeps each part's order for ties,
+        # like list.sort did, without a Python key call per comparison.
+        order = np.argsort(columns['start_s'], kind='stable')
+        self._set_note_columns({name: column[order] for name, column in columns.items()})
     
+    def _extract_part_notes(self, part, measures_data: Optional[List[Dict[str, Any]]] = None
+                            ) -> List[tuple]:
+        """Build the note rows (see NOTE_ROW_COLUMNS) for one part, in time order.
+
+        One forward pass over the part's measures, and the voices in them, gives
+        every element its measure number and absolute offset, instead of
+        flattening the part and searching for the measure of each element. When
+        ``measures_data`` is given, the same pass appends a record for each
+        measure to it.
+        """
+        rows = []
+
+        # (absolute offset, not a grace note, walk order, element), ordered below
+        # as in the flattened part: by offset, grace notes first, then in the
+        # order the measures and voices were walked
+        placed = [(el.offset, not el.duration.isGrace, i, el)
+                  for i, el in enumerate(part.notesAndRests)]
+        # The first measure at each offset, as measureOffsetMap gives them
+        measure_starts = {}
+        for m in part.getElementsByClass(stream.Measure):
+            tempo_mark = None
+            notes_count = 0
+            for el in m:
+                if isinstance(el, note.GeneralNote):
+                    placed.append((opFrac(m.offset + el.offset), not el.duration.isGrace,
+                                   len(placed), el))
+                    if isinstance(el, note.NotRest):
+                        notes_count += 1
+                elif isinstance(el, stream.Voice):
+                    voice_offset = opFrac(m.offset + el.offset)
+                    for voice_el in el:
+                        if isinstance(voice_el, note.GeneralNote):
+                            placed.append((opFrac(voice_offset + voice_el.offset),
+                                           not voice_el.duration.isGrace, len(placed), voice_el))
+                        elif tempo_mark is None and isinstance(voice_el, tempo.MetronomeMark):
+                            tempo_mark = voice_el
+                elif tempo_mark is None and isinstance(el, tempo.MetronomeMark):
+                    tempo_mark = el
+            measure_starts.setdefault(float(m.offset), m.number)
+            if measures_data is not None:
+                measures_data.append(self._measure_data(m, tempo_mark, notes_count))
+        measure_starts = sorted(measure_starts.items())
+        placed.sort(key=lambda p: p[:3])
+
+        # Each element's offset and duration properties are read only here
+        starts_q = np.fromiter((p[0] for p in placed), dtype=np.float64, count=len(placed))
+        durs_q = np.fromiter((p[3].duration.quarterLength for p in placed),
+                             dtype=np.float64, count=len(placed))
+
+        # The elements are in time order, so the measure each one starts in is
+        # found by advancing through the measure starts alongside them
+        next_measure = 0
+        measure = -1
+        for (_, _, _, el), start_q, dur_q in zip(placed, starts_q.tolist(), durs_q.tolist()):
+            while (next_measure < len(measure_starts)
+                   and measure_starts[next_measure][0] <= start_q):
+                measure = measure_starts[next_measure][1]
+                next_measure += 1
+
+            if isinstance(el, note.Note):
+                pitch = el.pitch
+                midi, frequency = self._pitch_midi_and_frequency(pitch)
+                articulations = el.articulations
+                rows.append((NOTE_TYPE_CODES['note'], start_q, dur_q, measure,
+                             pitch.name, pitch.octave, midi, frequency,
+                             self._note_velocity(el, DEFAULT_VELOCITY),
+                             [str(art) for art in articulations] if articulations else None,
+                             None, None))
+            elif isinstance(el, chord.Chord):
+                chord_velocity = self._note_velocity(el, DEFAULT_VELOCITY)
+                root = el.root()
+                chord_root = root.name if root else None
+                chord_quality = el.quality if hasattr(el, 'quality') else None
+                for component in el.notes:
+                    pitch = component.pitch
+                    midi, frequency = self._pitch_midi_and_frequency(pitch)
+                    rows.append((NOTE_TYPE_CODES['chord_note'], start_q, dur_q, measure,
+                                 pitch.name, pitch.octave, midi, frequency,
+                                 self._note_velocity(component, chord_velocity),
+                                 None, chord_root, chord_quality))
+            else:  # Rest
+                rows.append((NOTE_TYPE_CODES['rest'], start_q, dur_q, measure,
+                             None, 0, -1, 0.0, 0, None, None, None))
+
+        return rows
+    
+    def _note_columns_from_rows(self, rows: List[tuple],
+                                seconds_per_quarter: float) -> Dict[str, np.ndarray]:
+        """Store the per-note rows as parallel arrays, one per NOTE_ROW_COLUMNS field.
+
+        Row ``i`` of every column describes ``rows[i]``. The timings in seconds and
+        the ``pitch_name`` used by the game notes are derived here.
+        """
+        n = len(rows)
+        fields = list(zip(*rows)) if rows else [()] * len(NOTE_ROW_COLUMNS)
+        columns = {
+            name: np.fromiter(values, dtype=dtype, count=n)
+            for (name, dtype), values in zip(NOTE_ROW_COLUMNS, fields)
+        }
+        columns['start_s'] = columns['start_q'] * seconds_per_quarter
+        columns['dur_s'] = columns['dur_q'] * seconds_per_quarter
+        columns['pitch_name'] = self._pitch_names(columns['pitch'], columns['octave'])
+        return columns
+
+    @staticmethod
+    def _pitch_names(pitches: np.ndarray, octaves: np.ndarray) -> np.ndarray:
+        """Name with octave of each note, e.g. 'C#4', and None for rests"""
+        return np.fromiter((None if pitch is None else f"{pitch}{octave}"
+                            for pitch, octave in zip(pitches.tolist(), octaves.tolist())),
+                           dtype=object, count=len(pitches))
+
+    def _set_note_columns(self, columns: Dict[str, np.ndarray]):
+        """Adopt the note columns and derive the note ends and totals from them"""
+        self._note_columns = columns
+        self._note_ends = columns['start_s'] + columns['dur_s']
+        self._max_duration_s = float(columns['dur_s'].max(initial=0.0))
+        self.parsed_data['total_duration'] = float(self._note_ends.max(initial=0.0))
+
+    def _note_dicts(self, index: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Build the note dicts of ``parsed_data['notes']`` from the note columns.
+
+        ``index`` selects rows of the columns; by default every note is returned.
+        """
+        columns = self._note_columns
+        if index is not None:
+            columns = {name: column[index] for name, column in columns.items()}
+
+        notes_data = []
+        for (type_code, pitch, octave, midi, frequency, dur_q, dur_s, start_q, start_s,
+             measure, velocity, articulation, chord_root, chord_quality) in zip(
+                columns['type_code'].tolist(), columns['pitch'].tolist(),
+                columns['octave'].tolist(), columns['midi'].tolist(),
+                columns['frequency'].tolist(), columns['dur_q'].tolist(),
+                columns['dur_s'].tolist(), columns['start_q'].tolist(),
+                columns['start_s'].tolist(), columns['measure'].tolist(),
+                columns['velocity'].tolist(), columns['articulation'].tolist(),
+                columns['chord_root'].tolist(), columns['chord_quality'].tolist()):
+            timing = {
+                'duration_quarters': dur_q,
+                'duration_seconds': dur_s,
+                'start_time_quarters': start_q,
+                'start_time_seconds': start_s,
+                'measure_number': measure if measure >= 0 else None,
+            }
+            note_type = NOTE_TYPES[type_code]
+            if note_type == 'rest':
+                notes_data.append({'type': note_type, **timing})
+                continue
+            data = {
+                'type': note_type,
+                'pitch': pitch,
+                'octave': octave,
+                'midi_number': midi,
+                'frequency': frequency,
+                **timing,
+                'velocity': velocity,
+            }
+            if note_type == 'note':
+                data['articulation'] = articulation if articulation is not None else _EMPTY_LIST
+            else:
+                data['chord_root'] = chord_root
+                data['chord_quality'] = chord_quality
+            notes_data.append(data)
+        return notes_data
+
     def _get_element_timing(self, element, current_time: float) -> Dict[str, Any]:
         """Get timing information for a musical element"""
         quarter_length = element.duration.quarterLength
@@ -152,119 +1201,92 @@ class MusicXMLParser:
             'measure_number': element.measureNumber if hasattr(element, 'measureNumber') else None
         }
     
-    def _create_note_data(self, note_obj: note.Note, timing_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create note data dictionary for a single note"""
-        return {
-            'type': 'note',
-            'pitch': note_obj.pitch.name,
-            'octave': note_obj.pitch.octave,
-            'midi_number': note_obj.pitch.midi,
-            'frequency': note_obj.pitch.frequency,
-            'duration_quarters': timing_data['duration_quarters'],
-            'duration_seconds': timing_data['duration_seconds'],
-            'start_time_quarters': timing_data['start_time_quarters'],
-            'start_time_seconds': timing_data['start_time_seconds'],
-            'measure_number': timing_data['measure_number'],
-            'velocity': getattr(note_obj, 'velocity', 64),  # Default MIDI velocity
-            'articulation': [str(art) for art in note_obj.articulations] if note_obj.articulations else []
-        }
-    
-    def _create_chord_note_data(self, chord_obj: chord.Chord, pitch, timing_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create note data dictionary for a note within a chord"""
-        return {
-            'type': 'chord_note',
-            'pitch': pitch.name,
-            'octave': pitch.octave,
-            'midi_number': pitch.midi,
-            'frequency': pitch.frequency,
-            'duration_quarters': timing_data['duration_quarters'],
-            'duration_seconds': timing_data['duration_seconds'],
-            'start_time_quarters': timing_data['start_time_quarters'],
-            'start_time_seconds': timing_data['start_time_seconds'],
-            'measure_number': timing_data['measure_number'],
-            'velocity': getattr(chord_obj, 'velocity', 64),
-            'chord_root': chord_obj.root().name if chord_obj.root() else None,
-            'chord_quality': chord_obj.quality if hasattr(chord_obj, 'quality') else None
-        }
+    @staticmethod
+    def _note_velocity(note_obj, default: int) -> int:
+        """MIDI velocity set on a note or chord by the score, or ``default``
+
+        Velocity lives on ``note_obj.volume``; checking hasVolumeInformation()
+        first avoids creating an empty Volume object for every note.
+        """
+        if note_obj.hasVolumeInformation():
+            velocity = note_obj.volume.velocity
+            if velocity is not None:
+                return velocity
+        return default
     
-    def _create_rest_data(self, rest_obj: Rest, timing_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create rest data dictionary"""
+    def _measure_data(self, m, tempo_mark, notes_count: int) -> Dict[str, Any]:
+        """Record for ``parsed_data['measures']`` of one measure of the first part"""
+        seconds_per_quarter = self._seconds_per_quarter
+        ts = m.timeSignature
+        ks = m.keySignature
         return {
-            'type': 'rest',
-            'duration_quarters': timing_data['duration_quarters'],
-            'duration_seconds': timing_data['duration_seconds'],
-            'start_time_quarters': timing_data['start_time_quarters'],
-            'start_time_seconds': timing_data['start_time_seconds'],
-            'measure_number': timing_data['measure_number']
+            'number': m.number,
+            'start_time_quarters': m.offset,
+            'start_time_seconds': seconds_per_quarter * m.offset,
+            'duration_quarters': ts.barDuration.quarterLength if ts else None,
+            'duration_seconds': (seconds_per_quarter * ts.barDuration.quarterLength
+                                if ts else None),
+            'time_signature': [ts.numerator, ts.denominator] if ts else None,
+            'key_signature': {'sharps': ks.sharps, 'name': str(ks)} if ks else None,
+            'tempo': tempo_mark.getQuarterBPM() if tempo_mark else None,
+            'notes_count': notes_count
         }
     
-    def _extract_measures(self):
-        measures_data = []
-        for m in self.score.parts[0].getElementsByClass(stream.Measure):
-            ts = m.timeSignature
-            ks = m.keySignature
-            tempo_mark = next(m.recurse().getElementsByClass(tempo.MetronomeMark), None)
-            measures_data.append({
-                'number': m.number,
-                'start_time_quarters': m.offset,
-                'start_time_seconds': self._quarter_length_to_seconds(m.offset),
-                'duration_quarters': ts.barDuration.quarterLength if ts else None,
-                'duration_seconds': (self._quarter_length_to_seconds(ts.barDuration.quarterLength)
-                                    if ts else None),
-                'time_signature': [ts.numerator, ts.denominator] if ts else None,
-                'key_signature': {'sharps': ks.sharps, 'name': str(ks)} if ks else None,
-                'tempo': tempo_mark.getQuarterBPM() if tempo_mark else None,
-                'notes_count': len(m.notes)
-            })
-        self.parsed_data['measures'] = measures_data
-    
     def _quarter_length_to_seconds(self, quarter_length: float) -> float:
         """Convert quarter note lengths to seconds based on tempo"""
-        # 60 seconds per minute / tempo (quarter notes per minute) * quarter_length
-        return (60.0 / self.tempo_bpm) * quarter_length
+        # 60 seconds per minute / tempo (quarter notes per minute), cached per parse
+        return self._seconds_per_quarter * quarter_length
     
     def get_notes_for_range(self, start_seconds: float = 0, end_seconds: float = None) -> List[Dict[str, Any]]:
         """Get notes within a specific time range"""
         if end_seconds is None:
             end_seconds = self.parsed_data['total_duration']
         
-        filtered_notes = []
-        for note_data in self.parsed_data['notes']:
-            note_start = note_data['start_time_seconds']
-            note_end = note_start + note_data['duration_seconds']
-            
-            # Include notes that overlap with the time range
-            if note_start < end_seconds and note_end > start_seconds:
-                filtered_notes.append(note_data)
+        # Notes are sorted by start time, so only those starting before the end of
+        # the range and no more than the longest duration before its start can
+        # overlap; of those, the ones still sounding at its start are returned
+        starts = self._note_columns['start_s']
+        lo = int(np.searchsorted(starts, start_seconds - self._max_duration_s))
+        hi = int(np.searchsorted(starts, end_seconds))
+        mask = self._note_ends[lo:hi] > start_seconds
         
-        return filtered_notes
+        return self._note_dicts(np.flatnonzero(mask) + lo)
     
     def get_midi_notes_for_game(self) -> List[Dict[str, Any]]:
         """Get notes formatted for the Notefall game"""
-        game_notes = []
+        # Work on the note columns: drop rests with one mask and convert the
+        # timings for every note at once
+        columns = self._note_columns
+        playable = columns['type_code'] != NOTE_TYPE_CODES['rest']
+        durs_s = columns['dur_s'][playable]
         
-        for note_data in self.parsed_data['notes']:
-            if note_data['type'] in ['note', 'chord_note']:
-                # Convert to game format
-                game_note = {
-                    'midi_number': note_data['midi_number'],
-                    'start_time_ms': note_data['start_time_seconds'] * 1000,
-                    'duration_ms': note_data['duration_seconds'] * 1000,
-                    'pitch_name': f"{note_data['pitch']}{note_data['octave']}",
-                    'velocity': note_data.get('velocity', 64),
-                    'measure': note_data.get('measure_number', 1),
-                    'note_type': 'hold' if note_data['duration_seconds'] > 0.5 else 'tap'
-                }
-                game_notes.append(game_note)
-        
-        return game_notes
+        return [
+            {
+                'midi_number': midi_number,
+                'start_time_ms': start_ms,
+                'duration_ms': duration_ms,
+                'pitch_name': pitch_name,
+                'velocity': velocity,
+                'measure': measure if measure >= 0 else None,
+                'note_type': note_type
+            }
+            for midi_number, start_ms, duration_ms, pitch_name, velocity, measure, note_type in zip(
+                columns['midi'][playable].tolist(),
+                (columns['start_s'][playable] * 1000).tolist(),
+                (durs_s * 1000).tolist(),
+                columns['pitch_name'][playable].tolist(),
+                columns['velocity'][playable].tolist(),
+                columns['measure'][playable].tolist(),
+                np.where(durs_s > 0.5, 'hold', 'tap').tolist(),
+            )
+        ]
     
     def get_sheet_music_data(self) -> Dict[str, Any]:
         """Get notes formatted for sheet music rendering with VexFlow"""
         if not self.score:
             return None
             
-        print(f"DEBUG: Processing {len(self.score.parts)} parts for sheet music", file=sys.stderr)
+        _log.debug("Processing %d parts for sheet music", len(self.score.parts))
             
         sheet_music_data = {
             'measures': [],
@@ -273,204 +1295,274 @@ class MusicXMLParser:
             'metadata': self.parsed_data['metadata']
         }
         
-        # Process each measure
+        # Process each part's measures. Parts are independent, but the work is
+        # music21 property access that holds the GIL, so they run serially: a
+        # thread pool here is no faster and only adds start-up cost.
         for part_index, part in enumerate(self.score.parts):
-            measures = part.getElementsByClass(stream.Measure)
-            print(f"DEBUG: Part {part_index} has {len(measures)} measures", file=sys.stderr)
-            
-            for measure in measures:
-                measure_data = {
-                    'notes': [],
-                    'measureNumber': measure.number,
-                    'clef': 'treble',  # Default to treble clef
-                    'timeSignature': None,
-                    'keySignature': None
-                }
-                
-                # Get time signature from measure
-                ts = measure.timeSignature
-                if ts:
-                    measure_data['timeSignature'] = [ts.numerator, ts.denominator]
-                
-                # Get key signature from measure
-                ks = measure.keySignature
-                if ks:
-                    # Normalize key signature to something VexFlow can understand
-                    if 'no sharps or flats' in str(ks):
-                        measure_data['keySignature'] = 'C'
-                    else:
-                        measure_data['keySignature'] = str(ks)
-                
-                # Convert notes in this measure to VexFlow format
-                for element in measure.notesAndRests:
-                    if isinstance(element, note.Note):
-                        vf_note = self._convert_note_to_vexflow(element)
-                        if vf_note:
-                            measure_data['notes'].append(vf_note)
-                    elif isinstance(element, chord.Chord):
-                        vf_note = self._convert_chord_to_vexflow(element)
-                        if vf_note:
-                            measure_data['notes'].append(vf_note)
-                    elif isinstance(element, note.Rest):
-                        vf_note = self._convert_rest_to_vexflow(element)
-                        if vf_note:
-                            measure_data['notes'].append(vf_note)
-                
-                sheet_music_data['measures'].append(measure_data)
+            sheet_music_data['measures'].extend(self._part_to_vexflow(part_index, part))
         
-        print(f"DEBUG: Returning sheet music data with {len(sheet_music_data['measures'])} measures", file=sys.stderr)
+        _log.debug("Returning sheet music data with %d measures", len(sheet_music_data['measures']))
         if sheet_music_data['measures']:
-            first_measure = sheet_music_data['measures'][0]
-            print(f"DEBUG: First measure has {len(first_measure.get('notes', []))} notes", file=sys.stderr)
+            _log.debug("First measure has %d notes", len(sheet_music_data['measures'][0]['notes']))
         
         return sheet_music_data
     
-    def _convert_note_to_vexflow(self, note_obj: note.Note) -> Dict[str, Any]:
-        """Convert a music21 Note to VexFlow format"""
-        try:
-            # Convert pitch to VexFlow format (e.g., "C4", "F#5")
-            pitch_name = note_obj.pitch.name
-            octave = note_obj.pitch.octave
-            vf_key = f"{pitch_name}{octave}"
-            
-            # Convert duration to VexFlow format
-            vf_duration = self._duration_to_vexflow(note_obj.duration.quarterLength)
-            
-            return {
-                'keys': [vf_key],
-                'duration': vf_duration,
-                'startTime': float(note_obj.offset),
-                'endTime': float(note_obj.offset + note_obj.duration.quarterLength),
-                'id': f"note_{note_obj.offset}_{pitch_name}{octave}",
-                'midiNumbers': [note_obj.pitch.midi],
-                'stem_direction': 1 if note_obj.pitch.midi >= 60 else -1  # Middle C and above = up stem
+    def _part_to_vexflow(self, part_index: int, part) -> List[Dict[str, Any]]:
+        """Convert the measures of one part to VexFlow format.
+
+        The keys and MIDI numbers of every note and chord are read first, so the
+        stem directions of the whole part come from one NumPy comparison; the
+        note dicts are then built from those precomputed values.
+        """
+        measures = part.getElementsByClass(stream.Measure)
+        _log.debug("Part %d has %d measures", part_index, len(measures))
+        
+        measures_data = []
+        # (measure_data, element, keys, MIDI numbers) in score order; rests have no keys
+        entries = []
+        lowest_midis = []  # Lowest MIDI number of each note or chord
+        for measure in measures:
+            measure_data = {
+                'notes': [],
+                'measureNumber': measure.number,
+                'clef': 'treble',  # Default to treble clef
+                'timeSignature': None,
+                'keySignature': None
             }
-        except Exception as e:
-            print(f"Error converting note to VexFlow: {e}")
-            return None
-    
-    def _convert_chord_to_vexflow(self, chord_obj: chord.Chord) -> Dict[str, Any]:
-        """Convert a music21 Chord to VexFlow format"""
-        try:
-            # Convert all pitches in chord to VexFlow keys
-            vf_keys = []
-            midi_numbers = []
             
-            for pitch in chord_obj.pitches:
-                pitch_name = pitch.name
-                octave = pitch.octave
-                vf_keys.append(f"{pitch_name}{octave}")
-                midi_numbers.append(pitch.midi)
+            # Get time signature from measure
+            ts = measure.timeSignature
+            if ts:
+                measure_data['timeSignature'] = [ts.numerator, ts.denominator]
             
-            # Convert duration to VexFlow format
-            vf_duration = self._duration_to_vexflow(chord_obj.duration.quarterLength)
+            # Get key signature from measure
+            ks = measure.keySignature
+            if ks:
+                # Normalize key signature to something VexFlow can understand
+                if 'no sharps or flats' in str(ks):
+                    measure_data['keySignature'] = 'C'
+                else:
+                    measure_data['keySignature'] = str(ks)
             
-            return {
-                'keys': vf_keys,
-                'duration': vf_duration,
-                'startTime': float(chord_obj.offset),
-                'endTime': float(chord_obj.offset + chord_obj.duration.quarterLength),
-                'id': f"chord_{chord_obj.offset}_{len(vf_keys)}notes",
-                'midiNumbers': midi_numbers,
-                'stem_direction': 1 if min(midi_numbers) >= 60 else -1
-            }
-        except Exception as e:
-            print(f"Error converting chord to VexFlow: {e}")
-            return None
+            for element in measure.notesAndRests:
+                if isinstance(element, (note.Note, chord.Chord)):
+                    try:
+                        # VexFlow keys look like "C4" or "F#5"
+                        vf_keys = [f"{pitch.name}{pitch.octave}" for pitch in element.pitches]
+                        midi_numbers = [self._pitch_midi_and_frequency(pitch)[0]
+                                        for pitch in element.pitches]
+                        lowest_midis.append(min(midi_numbers))
+                    except Exception as e:
+                        _log.warning("Error converting %s to VexFlow: %s", type(element).__name__, e)
+                        continue
+                    entries.append((measure_data, element, vf_keys, midi_numbers))
+                elif isinstance(element, note.Rest):
+                    entries.append((measure_data, element, None, None))
+            measures_data.append(measure_data)
+        
+        # Middle C and above = up stem
+        stem_directions = iter(np.where(np.array(lowest_midis, dtype=np.int16) >= 60, 1, -1).tolist())
+        
+        # Convert notes in each measure to VexFlow format. The converters do no
+        # error handling of their own; an element that fails is logged and skipped
+        for measure_data, element, vf_keys, midi_numbers in entries:
+            try:
+                if isinstance(element, note.Note):
+                    vf_note = self._convert_note_to_vexflow(element, vf_keys, midi_numbers,
+                                                            next(stem_directions))
+                elif isinstance(element, chord.Chord):
+                    vf_note = self._convert_chord_to_vexflow(element, vf_keys, midi_numbers,
+                                                             next(stem_directions))
+                else:
+                    vf_note = self._convert_rest_to_vexflow(element)
+            except Exception as e:
+                _log.warning("Error converting %s to VexFlow: %s", type(element).__name__, e)
+                continue
+            measure_data['notes'].append(vf_note)
+        
+        return measures_data
+    
+    def _convert_note_to_vexflow(self, note_obj: note.Note, vf_keys: List[str],
+                                 midi_numbers: List[int], stem_direction: int) -> Dict[str, Any]:
+        """Convert a music21 Note, with its precomputed key and MIDI number, to VexFlow format"""
+        # Convert duration to VexFlow format
+        quarter_length = note_obj.duration.quarterLength
+        vf_duration = self._duration_to_vexflow(quarter_length)
+        offset = note_obj.offset
+        
+        return {
+            'keys': vf_keys,
+            'duration': vf_duration,
+            'startTime': float(offset),
+            'endTime': float(offset + quarter_length),
+            'id': "note_%d_%s" % (self._vexflow_id_ticks(offset), vf_keys[0]),
+            'midiNumbers': midi_numbers,
+            'stem_direction': stem_direction
+        }
+    
+    def _convert_chord_to_vexflow(self, chord_obj: chord.Chord, vf_keys: List[str],
+                                  midi_numbers: List[int], stem_direction: int) -> Dict[str, Any]:
+        """Convert a music21 Chord, with its precomputed keys and MIDI numbers, to VexFlow format"""
+        # Convert duration to VexFlow format
+        quarter_length = chord_obj.duration.quarterLength
+        vf_duration = self._duration_to_vexflow(quarter_length)
+        offset = chord_obj.offset
+        
+        return {
+            'keys': vf_keys,
+            'duration': vf_duration,
+            'startTime': float(offset),
+            'endTime': float(offset + quarter_length),
+            'id': "chord_%d_%dnotes" % (self._vexflow_id_ticks(offset), len(vf_keys)),
+            'midiNumbers': midi_numbers,
+            'stem_direction': stem_direction
+        }
     
     def _convert_rest_to_vexflow(self, rest_obj: note.Rest) -> Dict[str, Any]:
         """Convert a music21 Rest to VexFlow format"""
-        try:
-            # Convert duration to VexFlow format
-            vf_duration = self._duration_to_vexflow(rest_obj.duration.quarterLength)
-            
-            return {
-                'keys': ['B4'],  # VexFlow uses B4 for rest positioning
-                'duration': vf_duration,
-                'startTime': float(rest_obj.offset),
-                'endTime': float(rest_obj.offset + rest_obj.duration.quarterLength),
-                'id': f"rest_{rest_obj.offset}",
-                'midiNumbers': [],
-                'isRest': True
-            }
-        except Exception as e:
-            print(f"Error converting rest to VexFlow: {e}")
-            return None
+        # Convert duration to VexFlow format
+        quarter_length = rest_obj.duration.quarterLength
+        vf_duration = self._duration_to_vexflow(quarter_length)
+        offset = rest_obj.offset
+        
+        return {
+            'keys': ['B4'],  # VexFlow uses B4 for rest positioning
+            'duration': vf_duration,
+            'startTime': float(offset),
+            'endTime': float(offset + quarter_length),
+            'id': "rest_%d" % self._vexflow_id_ticks(offset),
+            'midiNumbers': [],
+            'isRest': True
+        }
+    
+    @staticmethod
+    def _vexflow_id_ticks(offset: float) -> int:
+        """Offset within the measure used in note ids, as a whole number of ticks"""
+        return int(round(offset * VEXFLOW_ID_TICKS_PER_QUARTER))
     
-    def _duration_to_vexflow(self, quarter_length: float) -> str:
+    # Scores use a handful of distinct durations, so results are memoized
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _duration_to_vexflow(quarter_length: float) -> str:
         """Convert music21 duration to VexFlow duration string"""
-        # Map common durations to VexFlow notation
-        duration_map = {
-            4.0: 'w',    # whole note
-            3.0: 'h.',   # dotted half
-            2.0: 'h',    # half note
-            1.5: 'q.',   # dotted quarter
-            1.0: 'q',    # quarter note
-            0.75: '8.',  # dotted eighth
-            0.5: '8',    # eighth note
-            0.25: '16',  # sixteenth note
-            0.125: '32', # thirty-second note
-        }
-        
-        # Find closest match
-        closest_dur = min(duration_map.keys(), key=lambda x: abs(x - quarter_length))
+        # Find closest match: the mapped durations either side of the bisection
+        # point, preferring the longer one on a tie
+        i = bisect_left(VEXFLOW_DURATION_QUARTERS, quarter_length)
+        if i == len(VEXFLOW_DURATION_QUARTERS) or (
+                i > 0 and quarter_length - VEXFLOW_DURATION_QUARTERS[i - 1]
+                < VEXFLOW_DURATION_QUARTERS[i] - quarter_length):
+            i -= 1
         
         # If the difference is small, use the mapped duration
-        if abs(closest_dur - quarter_length) < 0.1:
-            return duration_map[closest_dur]
+        if abs(VEXFLOW_DURATION_QUARTERS[i] - quarter_length) < 0.1:
+            return VEXFLOW_DURATIONS[i][1]
         
         # Default to quarter note if no close match
         return 'q'
 
 
+def write_json(data: Any, indent: Optional[bool] = None) -> None:
+    """Write data to stdout as JSON, using orjson when it is installed
+
+    The output is indented only when ``indent`` is set or, by default, when
+    stdout is a terminal; the app reads compact JSON through a pipe.
+    """
+    if indent is None:
+        indent = sys.stdout.isatty()
+    if ORJSON_AVAILABLE:
+        sys.stdout.flush()  # Keep any text already printed ahead of the JSON
+        option = orjson.OPT_INDENT_2 if indent else 0
+        sys.stdout.buffer.write(orjson.dumps(data, option=option))
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        # json.dump encodes chunk by chunk rather than building one large string
+        json.dump(data, sys.stdout, indent=2 if indent else None,
+                  separators=None if indent else (',', ':'))
+        sys.stdout.write("\n")
+
+
+def run_command(command: str, file_path: str) -> Any:
+    """Run one parser command on a file and return its result, ready for JSON"""
+    parser = MusicXMLParser()
+    
+    if command == "parse":
+        # Parse and return full data
+        return parser.parse_file(file_path)
+    
+    if command == "game_notes":
+        # Parse and return game-formatted notes
+        parser.parse_file(file_path, notes_only=True)
+        game_notes = parser.get_midi_notes_for_game()
+        return {
+            'notes': game_notes,
+            'metadata': parser.parsed_data['metadata'],
+            'tempo': parser.parsed_data['tempo'],
+            'total_duration': parser.parsed_data['total_duration']
+        }
+    
+    if command == "sheet_music":
+        # Parse and return sheet music formatted data
+        parser.parse_file(file_path)
+        return parser.get_sheet_music_data()
+    
+    raise ValueError(f"Unknown command: {command}")
+
+
+def serve():
+    """Answer parser requests read from stdin until it is closed.
+
+    Each line is a JSON request such as ``{"cmd": "game_notes", "file": "..."}``
+    and gets one line of JSON back: the command's result, or an error object.
+    Keeping the process alive means music21 is imported, and the memoized
+    lookups filled, once for the whole session instead of once per file.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            result = run_command(request['cmd'], request['file'])
+        except Exception as e:
+            result = {
+                'error': str(e),
+                'success': False
+            }
+        write_json(result, indent=False)
+        sys.stdout.flush()
+
+
 def main():
     """Main function for command-line usage"""
+    if len(sys.argv) == 2 and sys.argv[1] == "--serve":
+        serve()
+        return
+    
     if len(sys.argv) < 3:
         print("Usage: python musicxml_parser.py <command> <file_path>")
-        print("Commands: parse, game_notes")
+        print("       python musicxml_parser.py --serve")
+        print("Commands: parse, game_notes, sheet_music")
         sys.exit(1)
     
     command = sys.argv[1]
     file_path = sys.argv[2]
     
+    if command not in ("parse", "game_notes", "sheet_music"):
+        print(f"Unknown command: {command}")
+        sys.exit(1)
+    
     try:
-        parser = MusicXMLParser()
-        
-        if command == "parse":
-            # Parse and return full data
-            result = parser.parse_file(file_path)
-            print(json.dumps(result, indent=2))
-            
-        elif command == "game_notes":
-            # Parse and return game-formatted notes
-            parser.parse_file(file_path)
-            game_notes = parser.get_midi_notes_for_game()
-            result = {
-                'notes': game_notes,
-                'metadata': parser.parsed_data['metadata'],
-                'tempo': parser.parsed_data['tempo'],
-                'total_duration': parser.parsed_data['total_duration']
-            }
-            print(json.dumps(result, indent=2))
-            
-        elif command == "sheet_music":
-            # Parse and return sheet music formatted data
-            parser.parse_file(file_path)
-            sheet_music_data = parser.get_sheet_music_data()
-            print(json.dumps(sheet_music_data, indent=2))
-            
-        else:
-            print(f"Unknown command: {command}")
-            sys.exit(1)
+        write_json(run_command(command, file_path))
+        sys.stdout.flush()
             
     except Exception as e:
         error_result = {
             'error': str(e),
             'success': False
         }
-        print(json.dumps(error_result))
+        write_json(error_result)
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -7,10 +7,24 @@ from io import StringIO
 from contextlib import redirect_stdout, redirect_stderr
 from gradio_client import Client
 
+GRADIO_URL = "http://127.0.0.1:7860/"
+
+# Connecting fetches the server's config and API schema, so one Client is kept
+# for every request this process handles
+_client = None
+
+def _get_client():
+    """Return the shared Gradio client, connecting on first use"""
+    global _client
+    if _client is None:
+        _client = Client(GRADIO_URL)
+    return _client
+
 def generate_tts(text, voice_name="af_heart", format_type="wav", speed=1.0):
     """
     Generate TTS audio using Gradio client
     """
+    global _client
     try:
         # Capture gradio_client output to prevent it from interfering with JSON
         captured_output = StringIO()
@@ -18,7 +32,7 @@ def generate_tts(text, voice_name="af_heart", format_type="wav", speed=1.0):
         
         with redirect_stdout(captured_output), redirect_stderr(captured_errors):
             # Connect to the Gradio server
-            client = Client("http://127.0.0.1:7860/")
+            client = _get_client()
             
             # Call the TTS generation API
             result = client.predict(
@@ -37,13 +51,44 @@ def generate_tts(text, voice_name="af_heart", format_type="wav", speed=1.0):
         }
         
     except Exception as e:
+        # The server may have restarted; connect again on the next request
+        _client = None
         return {
             "success": False,
             "error": str(e),
             "message": f"Failed to generate TTS: {str(e)}"
         }
 
+def serve():
+    """
+    Answer TTS requests read from stdin, one JSON object per line, until it closes.
+    Each request looks like {"text": ..., "voice": ..., "format": ..., "speed": ...}
+    (all but text optional) and gets one line of JSON back.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            result = generate_tts(
+                request["text"],
+                request.get("voice", "af_heart"),
+                request.get("format", "wav"),
+                float(request.get("speed", 1.0))
+            )
+        except Exception as e:
+            result = {
+                "success": False,
+                "error": str(e),
+                "message": f"Invalid TTS request: {str(e)}"
+            }
+        print(json.dumps(result), flush=True)
+
 def main():
+    if len(sys.argv) == 2 and sys.argv[1] == "--serve":
+        serve()
+        return
+    
     if len(sys.argv) < 2:
         print(json.dumps({
             "success": False,